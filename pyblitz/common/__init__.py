@@ -16,15 +16,21 @@ class Endpoint(ABC):
 
     @classmethod
     def url(cls):
-        urlNames = list(cls._urlNamesFromLeaf())
-        return "/" + "/".join(reversed(urlNames))
-
-    @classmethod
-    def _urlNamesFromLeaf(cls):
-        currEndpoint = cls
-        while currEndpoint is not None:
-            yield currEndpoint._urlName()
-            currEndpoint = currEndpoint._parentEndpoint()
+        # endpoint classes never change once generated, so the url only needs to be built once;
+        # it's stored on the class itself (and not some global cache) since VariableEndpoints
+        # are new classes created on every ExpressionEndpoint call
+        url = cls.__dict__.get('_cachedUrl')
+        if url is None:
+            # walks from this (leaf) endpoint up to the root, so names are collected backwards
+            urlNames = []
+            currEndpoint = cls
+            while currEndpoint is not None:
+                urlNames.append(currEndpoint._urlName())
+                currEndpoint = currEndpoint._parentEndpoint()
+            urlNames.reverse()
+            url = "/" + "/".join(urlNames)
+            cls._cachedUrl = url
+        return url
 
     @classmethod
     def schemaInResponseJson(cls, method):
@@ -78,21 +84,27 @@ class ExpressionEndpoint(Endpoint, ABC):
 class Schema(ABC):
     # NoProp != None since that could be an expected parameter value
     class NoProp:
+        __slots__ = () # only one of these is ever made, and it never holds any data
+        
         def __repr__(self):
             return str(self)
         def __str__(self):
             return "<NoProp>"
     NoProp = NoProp()
 
+    # generated children list their properties in their own __slots__, which only
+    # saves memory (instances have no __dict__) if every base class uses slots too
+    __slots__ = ('_filter', '__initted')
+
     def __new__(cls, *args, **kwargs):
         self = super().__new__(cls)
         self.__init__(*args, **kwargs)
-        if not '_Schema__initted' in self.__dict__ or not self.__initted:
+        if not getattr(self, '_Schema__initted', False):
             raise TypeError("Child of Schema did not call Schema.__init__()")
         return self
 
     def __init__(self):
-        self._filter = dict()
+        self._filter = frozenset()
         self.__initted = True
     
     def __eq__(self, other):
@@ -100,18 +112,20 @@ class Schema(ABC):
     
     def serialize(self, ignoreFilter=False) -> dict:
         serialDict = self._serialize()
-        shouldFilter = not ignoreFilter and len(self._filter) > 0
+        shouldFilter = not ignoreFilter and self._filter
         if shouldFilter:
+            serialFilter = self._filter
             return {
                 key: val
                 for (key, val) in serialDict.items()
-                if key in self._filter
+                if key in serialFilter
             }
         else:
             return serialDict
 
     def serialFilter(self, *paramsToUse):
-        self._filter = paramsToUse
+        # a set keeps membership checks in serialize() constant-time for wide schema
+        self._filter = frozenset(paramsToUse)
 
     @abstractmethod
     def _serialize(self):
@@ -128,12 +142,15 @@ class Schema(ABC):
         return # None, but load the jsonDict into class properties
 
 def _convertDashesToCamelCase(string: str):
-    strList = string.split("-")
-    firstStr = strList.pop(0)
+    (firstStr, dash, strAfterFirstDash) = string.partition("-")
+    if dash == "":
+        # most names don't have dashes at all, so there's nothing to convert
+        return string
     return firstStr + "".join(
         _capitalize(strAfterDash)
-        for strAfterDash in strList
+        for strAfterDash in strAfterFirstDash.split("-")
     )
 
 def _capitalize(string: str):
-    return string[0].upper() + string[1:]
+    # slicing (instead of indexing) keeps empty strings (from "--") from raising
+    return string[:1].upper() + string[1:]
@@ -0,0 +1,33 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None # falls back to the (slower) stdlib json module
+
+
+def _loadJson(jsonBytes):
+    """Decodes json from `bytes` (or a `bytearray`, `memoryview`, or `str`), with `orjson` when it's installed"""
+    if orjson is not None:
+        return orjson.loads(jsonBytes)
+    if type(jsonBytes) is memoryview:
+        # the json module can't read memoryviews directly
+        jsonBytes = jsonBytes.tobytes()
+    return json.loads(jsonBytes)
+
+
+def _dumpJson(obj, default) -> bytes:
+    """Encodes `obj` as json `bytes` (with sorted keys), with `orjson` when it's installed
+
+    `default` is called for objects that can't be encoded on their own. Unlike the json module,
+    `orjson` encodes `nan` and `inf` floats as `null`.
+    """
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # orjson refuses some things the json module allows (like ints too big for
+            # 64 bits), which are still worth being able to send
+            pass
+    return json.dumps(obj, default=default, sort_keys=True).encode()
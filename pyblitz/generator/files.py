@@ -1,23 +1,184 @@
-import json
+import hashlib
+import inspect
+import mmap
+import pickle
+import py_compile
+import stat
 import sys
 import os
 
+from ..common.jsoncodec import _loadJson
+from .parser import Parser
+
 
 # /path/to/pyblitz/__init__.py
 _moduleInitPath = sys.modules['pyblitz'].__file__
 
 # /path/to/pyblitz
-_moduleRootPath = os.path.normpath(os.path.join(_moduleInitPath, ".."))
+_moduleRootPath = os.path.dirname(_moduleInitPath)
+
+# ~/.cache/pyblitz (where parsed OpenAPI specs are cached)
+_specCacheDirPath = os.path.join(os.path.expanduser("~"), ".cache", "pyblitz")
+
 
 
 def _readOpenAPIFile(pathToJson):
     """Given the path to a json file, this converts it into a python `dict`"""
-    with open(pathToJson) as jsonFile:
-        jsonDict = json.load(jsonFile)
+    with open(pathToJson, "rb") as jsonFile:
+        jsonStat = os.fstat(jsonFile.fileno())
+        if stat.S_ISREG(jsonStat.st_mode) and jsonStat.st_size > 0:
+            # orjson can parse the mapped file's bytes in place, skipping the copy into a str
+            with mmap.mmap(jsonFile.fileno(), 0, access=mmap.ACCESS_READ) as jsonMap, memoryview(jsonMap) as jsonBytes:
+                jsonDict = _loadJson(jsonBytes)
+        else:
+            # pipes (like /dev/stdin) can't be mapped, and neither can empty files
+            jsonDict = _loadJson(jsonFile.read())
     return jsonDict
 
 
+def _readCachedOpenAPIFile(pathToJson):
+    """Like `_readOpenAPIFile()`, but reuses the `dict` parsed by an earlier call if the file hasn't changed since
+
+    Parsed specs are pickled into `_specCacheDirPath` (one per spec path), alongside the file's
+    modification time and size at the time it was parsed. Specs that aren't regular files (like
+    pipes) are never cached. Caching can be turned off by setting the `PYBLITZ_NO_CACHE`
+    environment variable to "1".
+    """
+
+    if os.environ.get("PYBLITZ_NO_CACHE") == "1":
+        return _readOpenAPIFile(pathToJson)
+
+    absPathToJson = os.path.abspath(pathToJson)
+    specStat = os.stat(absPathToJson)
+    if not stat.S_ISREG(specStat.st_mode):
+        # a pipe's modification time says nothing about what will be read from it
+        return _readOpenAPIFile(pathToJson)
+    specVersion = (specStat.st_mtime_ns, specStat.st_size)
+    cacheName = hashlib.sha1(absPathToJson.encode("utf-8")).hexdigest()
+    cachePath = os.path.join(_specCacheDirPath, f"spec-{cacheName}.pickle")
+
+    try:
+        with open(cachePath, "rb") as cacheFile:
+            (cachedSpecVersion, cachedJsonDict) = pickle.load(cacheFile)
+        if cachedSpecVersion == specVersion:
+            return cachedJsonDict
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass # not cached yet (or the cache is unusable), so the spec just needs to be parsed
+
+    jsonDict = _readOpenAPIFile(absPathToJson)
+    try:
+        os.makedirs(_specCacheDirPath, exist_ok=True)
+        # written to the side first so a crash can never leave a half-written cache behind
+        partialCachePath = f"{cachePath}.{os.getpid()}.partial"
+        with open(partialCachePath, "wb") as cacheFile:
+            pickle.dump((specVersion, jsonDict), cacheFile, pickle.HIGHEST_PROTOCOL)
+        os.replace(partialCachePath, cachePath)
+    except OSError:
+        pass # caching is only an optimization; failing to cache shouldn't fail generation
+    return jsonDict
+
+
+def _hashApiInputs(ParserClass, pathToJson):
+    """Returns a hash of everything that goes into generating an api.py file: the spec file's bytes,
+    the `Parser` used to read it (and its source), and pyblitz's own source code
+
+    Returns `None` if the spec isn't a regular file (like a pipe), since reading it here would
+    leave nothing behind to actually parse.
+    """
+
+    if not os.path.isfile(pathToJson):
+        return None
+    apiHash = hashlib.blake2b()
+    apiHash.update(f"{ParserClass.__module__}.{ParserClass.__qualname__}\0".encode("utf-8"))
+    # a dict (with no values) keeps the paths in order while skipping duplicates
+    sourcePaths = dict.fromkeys(_pyblitzSourcePaths())
+    for ParserBaseClass in ParserClass.__mro__:
+        if issubclass(ParserBaseClass, Parser):
+            try:
+                sourcePath = inspect.getsourcefile(ParserBaseClass)
+            except (TypeError, OSError):
+                sourcePath = None # defined somewhere without a source file (like the REPL)
+            if sourcePath is not None:
+                sourcePaths[sourcePath] = None
+    for filePath in (*sourcePaths, pathToJson):
+        with open(filePath, "rb") as inputFile:
+            apiHash.update(inputFile.read())
+        apiHash.update(b"\0")
+    return apiHash.hexdigest()
+
+
+def _pyblitzSourcePaths():
+    """Returns the paths to all of pyblitz's own source files (in a stable order), since any
+    of them can change the generated api.py (like `common`'s name conversions)"""
+    sourcePaths = []
+    for (dirPath, dirNames, fileNames) in os.walk(_moduleRootPath):
+        dirNames[:] = sorted(dirName for dirName in dirNames if dirName != "__pycache__")
+        sourcePaths.extend(
+            os.path.join(dirPath, fileName)
+            for fileName in sorted(fileNames)
+            if fileName.endswith(".py")
+        )
+    return sourcePaths
+
+
+def _isApiFileUpToDate(filePath, apiHash):
+    """Returns whether the api.py file at the given path was last generated from inputs with the given hash
+    (and hasn't been changed since)
+
+    The hashes of each generated file's inputs and contents are stored next to it, in a sidecar
+    "<api file>.hash" file. Setting the `PYBLITZ_NO_CACHE` environment variable to "1" makes this
+    always return `False`.
+    """
+
+    if os.environ.get("PYBLITZ_NO_CACHE") == "1" or not os.path.isfile(filePath):
+        return False
+    try:
+        with open(f"{filePath}.hash", "r", encoding="utf-8") as hashFile:
+            (recordedApiHash, _, recordedContentsHash) = hashFile.read().partition("\n")
+        # the api.py file's own contents are checked too, so hand edits (or a corrupted file)
+        # still get overwritten by a fresh generation
+        return recordedApiHash == apiHash and recordedContentsHash == _hashFileContents(filePath)
+    except OSError:
+        return False
+
+
+def _recordApiFileHash(filePath, apiHash):
+    """Stores the hash of the inputs the api.py file at the given path was just generated from,
+    along with a hash of the file itself (unless the `PYBLITZ_NO_CACHE` environment variable is "1")"""
+
+    if os.environ.get("PYBLITZ_NO_CACHE") == "1":
+        return
+    hashPath = f"{filePath}.hash"
+    try:
+        contentsHash = _hashFileContents(filePath)
+        # written to the side first so a crash can never leave a half-written hash behind
+        partialHashPath = f"{hashPath}.{os.getpid()}.partial"
+        with open(partialHashPath, "w", encoding="utf-8") as hashFile:
+            hashFile.write(f"{apiHash}\n{contentsHash}")
+        os.replace(partialHashPath, hashPath)
+    except OSError:
+        pass # like the spec cache, this is only an optimization
+
+
+def _hashFileContents(filePath):
+    with open(filePath, "rb") as hashedFile:
+        return hashlib.blake2b(hashedFile.read()).hexdigest()
+
+
 def _createApiFile(filePath):
-    """This function creates the api.py file at the given file path"""
+    """This function creates the api.py file at the given file path (opened for writing bytes)"""
     assert filePath[-3:] == ".py"
-    return open(filePath, "w")
+    return open(filePath, "wb")
+
+
+def _compileApiFile(filePath):
+    """Byte-compiles the (just written) api.py file at the given path into its `__pycache__`
+
+    This way the first import of the api module doesn't have to compile it (which takes a while
+    for big APIs), and any syntax errors in generated code are found now, instead of on import.
+    """
+
+    try:
+        py_compile.compile(filePath, doraise=True)
+    except OSError:
+        pass # the cache directory can't be written to; the module will just be compiled on import
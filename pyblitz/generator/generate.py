@@ -1,20 +1,24 @@
-import re
 from typing import Iterable
 
-from .files import _readOpenAPIFile, _createApiFile
+from .files import _readCachedOpenAPIFile, _createApiFile, _compileApiFile, _hashApiInputs, _isApiFileUpToDate, _recordApiFileHash
 from .parser import Parser
 
 
 def generateAPI(ParserClass: Parser, openApiFilePath: str, apiOutputPath: str):
     """Generates the api.py file given a parser and API spec-file location"""
-    if not isinstance(type(ParserClass), type) or not issubclass(ParserClass, Parser):
+    if not (isinstance(ParserClass, type) and issubclass(ParserClass, Parser)):
         raise TypeError("generateAPI() requires ParserClass to be a reference to some subclass of Parser, \
             specifically the Parser for the version of spec-file you're using")
 
-    if apiOutputPath[-3:] != ".py":
+    if not apiOutputPath.endswith(".py"):
         raise ValueError("apiOutputPath must point to a '.py' file")
 
-    jsonDict = _readOpenAPIFile(openApiFilePath)
+    # nothing to do if the api file was already generated from this exact spec (and generator)
+    apiHash = _hashApiInputs(ParserClass, openApiFilePath)
+    if apiHash is not None and _isApiFileUpToDate(apiOutputPath, apiHash):
+        return
+
+    jsonDict = _readCachedOpenAPIFile(openApiFilePath)
 
     parser = ParserClass()
     parser.parse(jsonDict)
@@ -23,6 +27,10 @@ def generateAPI(ParserClass: Parser, openApiFilePath: str, apiOutputPath: str):
         writer.writeServers(parser.servers)
         writer.writeEndpoints(parser.endpoints)
         writer.writeSchema(parser.schema)
+        writer.flush()
+    _compileApiFile(apiOutputPath)
+    if apiHash is not None:
+        _recordApiFileHash(apiOutputPath, apiHash)
 
 
 _imports = """\
@@ -94,7 +102,7 @@ def _useExpressionEndpointTemplate(*args, endpointName, parentRef, pathValueName
 def _useEndpointMethod_noDataTemplate(*args, methodName, methodDesc):
     return (
         f'@classmethod\n'
-        f'def {methodName}(cls, *args, headers = dict(), data = None, **params) -> pyblitz.http.Response:\n'
+        f'def {methodName}(cls, *args, headers = None, data = None, **params) -> pyblitz.http.Response:\n'
         f'    """{methodDesc}"""\n'
         f'    return pyblitz.http.{methodName}(cls, *args, headers = headers, data = data, **params)'
     )
@@ -102,11 +110,20 @@ def _useEndpointMethod_noDataTemplate(*args, methodName, methodDesc):
 def _useEndpointMethod_fullTemplate(*args, methodName, methodDesc):
     return (
         f'@classmethod\n'
-        f'def {methodName}(cls, data, *args, headers=dict(), **params) -> pyblitz.http.Response:\n'
+        f'def {methodName}(cls, data, *args, headers=None, **params) -> pyblitz.http.Response:\n'
         f'    """{methodDesc}"""\n'
         f'    return pyblitz.http.{methodName}(cls, data, *args, headers=headers, **params)'
     )
 
+# methods that don't normally send data only take it as a keyword argument
+_endpointMethodTemplatesByName = {
+    "delete": _useEndpointMethod_noDataTemplate,
+    "get": _useEndpointMethod_noDataTemplate,
+    "patch": _useEndpointMethod_fullTemplate,
+    "post": _useEndpointMethod_fullTemplate,
+    "put": _useEndpointMethod_fullTemplate,
+}
+
 def _useEndpointSchemaInResponseGettersTemplate(*args, schemaInResponseDelete, schemaInResponseGet, schemaInResponsePatch, schemaInResponsePost, schemaInResponsePut):
     return (
         f'@classmethod\n'
@@ -134,29 +151,29 @@ _schemaGlobals = """\
 # schema base classes are located in the `common` module\
 """
 
-def _useSchemaTemplate(*args, schemaName, schemaDesc, propDefNames, methodSep, propDefsParams, propDefsAssignments):
+def _useSchemaTemplate(*args, schemaName, schemaDesc, propDefNames, methodSep, propDefsParams, propDefsAssignments, propDefsSerializes):
     return (
         f'class {schemaName}(pyblitz.Schema):\n'
         f'    """{schemaDesc}"""\n'
-        f'    _propNames = {propDefNames}'
+        f'    _propNames = {propDefNames}\n'
+        f'    _propNameSet = frozenset(_propNames)\n'
+        f'    __slots__ = _propNames'
         f'    {methodSep}'
         f'    def __init__(self, {propDefsParams}):\n'
         f'        super().__init__()\n'
         f'        {propDefsAssignments}'
         f'    {methodSep}'
         f'    def _serialize(self):\n'
-        f'        serialDict = {{\n'
-        f'            propName: propVal\n'
-        f'            for propName in self._propNames\n'
-        f'            for propVal in [self.__dict__[propName]]\n'
-        f'            if propVal is not pyblitz.Schema.NoProp\n'
-        f'        }}\n'
+        f'        noProp = NoProp\n'
+        f'        serialDict = dict()'
+        f'{propDefsSerializes}\n'
         f'        return serialDict'
         f'    {methodSep}'
         f'    def _loadJsonDict(self, jsonDict, looseChecking):\n'
+        f'        propNameSet = self._propNameSet\n'
         f'        for (propName, propVal) in jsonDict.items():\n'
-        f'            if propName in self._propNames:\n'
-        f'                self.__dict__[propName] = propVal\n'
+        f'            if propName in propNameSet:\n'
+        f'                setattr(self, propName, propVal)\n'
         f'            elif not looseChecking:\n'
         f'                raise KeyError(f"Unknown property \'{{propName}}\' found when loading Schema")'
     )
@@ -170,22 +187,41 @@ def _usePropAssignmentTemplate(*args, propName, propDesc):
         f'"""{propDesc}"""'
     )
 
+def _usePropSerializeTemplate(*args, propName):
+    return (
+        f'propVal = self.{propName}\n'
+        f'if propVal is not noProp:\n'
+        f'    serialDict["{propName}"] = propVal'
+    )
+
+
+# marks where separately generated code goes in a template's output, so
+# the template's code can be split around it
+_codeSlot = "\0"
+
+# a list of (absolute indentLevel, code) pairs; see _EndpointWriter._genEndpoints()
+_CodeFragments = list[tuple[int, str]]
+
 
 class _EndpointWriter:
     """Converts all Parser.Endpoints to classes (via string templates) and writes them to an api.py file
 
-    Construct with a file (or anything with a .write() method), then write in any order:
+    Construct with a binary file (or anything with a .write() method accepting bytes), then
+    write in any order and `flush()` once everything has been written:
     ```
         writer = _EndpointWriter(file)
         writer.writeServers(parser.servers)
         writer.writeEndpoints(parser.endpoints)
         writer.writeSchema(parser.schema)
+        writer.flush()
     ```
     """
 
     # what "one indent" means; if you change this, make sure to change
     # the templates too
     _indentStr = "    "
+    # one indent level is by far the most common, so it gets its own shortcut in `_indent()`
+    _newlineIndent = "\n" + _indentStr
     # "seps" control newline separation in different cases; each of
     # these should always contain at least one newline, or else you'll
     # generate syntax errors (one newline = "squished mode"; try it!)
@@ -195,222 +231,247 @@ class _EndpointWriter:
 
     def __init__(self, file):
         self._file = file
-        self._file.write(_imports)
+        # maps indent levels to their "\n" + indent strings, so they're only built once
+        self._newlineIndentsByLevel = dict()
+        # per-endpoint cache, since this gets asked about the same endpoints many times
+        self._exprAncestryByEndpoint = dict()
+        # rendered code caches; many endpoints share the same method descriptions (often
+        # none at all) and most have the same (empty) schema-in-response getters
+        self._methodCodeByNameAndDesc = dict()
+        self._schemaInResponseGettersCodeByStrs = dict()
+        # every code fragment is collected here first and joined once, so the file
+        # only receives one (big) write
+        self._chunks = [_imports]
+
+    def flush(self):
+        # the generated code is encoded once here, rather than by a text file on every write
+        self._file.write("".join(self._chunks).encode("utf-8"))
+        self._chunks = []
 
     def writeServers(self, servers: Iterable[Parser.Server]):
-        registerFnsCode = self._classSep + "\n".join(
-            serverRegisterCode
-            for server in servers
-            for serverRegisterCode in [_useRegisterServerTemplate(
+        self._chunks.append(self._classSep)
+        self._chunks.append("\n".join([
+            _useRegisterServerTemplate(
                 serverName = server.name,
                 serverUrl = server.url,
                 serverDesc = server.desc,
-            )]
-        )
-        self._file.write(registerFnsCode + self._classSep)
+            )
+            for server in servers
+        ]))
+        self._chunks.append(self._classSep)
 
     def writeEndpoints(self, rootEndpoints: Iterable[Parser.Endpoint]):
-        self._file.write(_endpointGlobals)
-        self._file.write(self._genEndpoints(rootEndpoints) + self._classSep)
+        self._chunks.append(_endpointGlobals)
+        fragments = []
+        self._genEndpoints(rootEndpoints, 0, fragments)
+        self._chunks.extend(self._indentFragments(fragments))
+        self._chunks.append(self._classSep)
 
     def writeSchema(self, schema: Iterable[Parser.Schema]):
-        self._file.write(_schemaGlobals)
-        self._file.write(self._genSchema(schema) + self._classSep)
-
-    def _genEndpoints(self, endpoints: Iterable[Parser.Endpoint]) -> str:
-        return "".join(
-            self._classSep + endpointCode
-            for endpoint in endpoints
-            for endpointCode in [self._genEndpointAndChildren(endpoint)]
-        )
-
-    def _genEndpointAndChildren(self, endpoint: Parser.Endpoint) -> str:
-        if self._isExpressionEndpoint(endpoint):
-            return self._genExpressionEndpointAndChildren(endpoint)
+        self._chunks.append(_schemaGlobals)
+        self._genSchema(schema, self._chunks)
+        self._chunks.append(self._classSep)
+
+    # endpoint code is generated as "fragments", or (indentLevel, code) pairs, where the
+    # indentLevel is absolute (from the start of the file); this way each piece of code
+    # is indented exactly once (by `_indentFragments()`), instead of once per ancestor;
+    # every generator appends to the same `fragments` list (in output order), so no
+    # fragment is ever copied into its parent's list on the way back up the tree
+
+    def _genEndpoints(self, endpoints: Iterable[Parser.Endpoint], indentLevel: int, fragments: _CodeFragments):
+        classSep = self._classSep
+        for endpoint in endpoints:
+            fragments.append((indentLevel, classSep))
+            self._genEndpointAndChildren(endpoint, indentLevel, fragments)
+
+    def _genEndpointAndChildren(self, endpoint: Parser.Endpoint, indentLevel: int, fragments: _CodeFragments):
+        # children are split in one pass, which both decides the endpoint type and
+        # saves the expression generator from walking them a second time
+        varEndpointChild = None
+        nonVarChildEndpoints = []
+        for child in endpoint.children:
+            if child.isVariable:
+                assert varEndpointChild is None, "expression endpoints can only have one variable endpoint child"
+                varEndpointChild = child
+            else:
+                nonVarChildEndpoints.append(child)
+
+        if varEndpointChild is not None:
+            self._genExpressionEndpointAndChildren(endpoint, varEndpointChild, nonVarChildEndpoints, indentLevel, fragments)
         else:
-            return self._genFixedEndpointAndChildren(endpoint)
+            self._genFixedEndpointAndChildren(endpoint, indentLevel, fragments)
 
-    def _genFixedEndpointAndChildren(self, endpoint: Parser.Endpoint) -> str:
-        childClassesCode = self._indent(self._genEndpoints(endpoint.children))
-
-        endpointMethodStrs = self._indent("".join(
-            self._methodSep + methodStr
-            for method in endpoint.methods
-            for methodTemplateFn in [
-                _useEndpointMethod_noDataTemplate if method.name in ("get", "delete")
-                else _useEndpointMethod_fullTemplate
-            ]
-            for methodStr in [methodTemplateFn(
-                methodName = method.name,
-                methodDesc = method.desc,
-            )]
-        ))
+    def _genFixedEndpointAndChildren(self, endpoint: Parser.Endpoint, indentLevel: int, fragments: _CodeFragments):
+        endpointMethodStrs = self._genMethodsCode(endpoint)
 
         parentRef = self._genParentsFromExprAncestorStr(endpoint)
 
-        schemaInResponseGetters = self._indent(self._methodSep + self._genSchemaInResponseGettersStr(endpoint))
+        schemaInResponseGetters = self._genSchemaInResponseGettersCode(endpoint)
 
-        return _useFixedEndpointTemplate(
+        endpointCode = _useFixedEndpointTemplate(
             endpointName = endpoint.className,
             parentRef = parentRef,
             urlNameStr = f'"{endpoint.pathName}"',
             methodsCode = endpointMethodStrs,
-            childClassesCode = childClassesCode,
+            childClassesCode = _codeSlot,
             schemaInResponseGettersCode = schemaInResponseGetters,
         )
-
-    def _genExpressionEndpointAndChildren(self, endpoint: Parser.Endpoint) -> str:
-        nonVarChildEndpoints = list(endpoint.children)
-        varEndpointChildren = [
-            child
-            for child in nonVarChildEndpoints
-            if self._isVariableEndpoint(child)
-        ]
-        assert len(varEndpointChildren) == 1
-        varEndpointChild = varEndpointChildren[0]
+        (beforeChildrenCode, afterChildrenCode) = endpointCode.split(_codeSlot)
+        fragments.append((indentLevel, beforeChildrenCode))
+        self._genEndpoints(endpoint.children, indentLevel + 1, fragments)
+        fragments.append((indentLevel, afterChildrenCode))
+
+    def _genExpressionEndpointAndChildren(
+        self,
+        endpoint: Parser.Endpoint,
+        varEndpointChild: Parser.Endpoint,
+        nonVarChildEndpoints: list[Parser.Endpoint],
+        indentLevel: int,
+        fragments: _CodeFragments,
+    ):
         # TODO: what if the child is also an expression endpoint?
         #       (probably need to add a _useVariableExpressionEndpointTemplate()
         #       that merges the two other templates)
-        assert not self._isExpressionEndpoint(varEndpointChild), "expression endpoints cannot currently handle expression endpoint children"
-        nonVarChildEndpoints.remove(varEndpointChild)
+        assert not varEndpointChild.isExpression, "expression endpoints cannot currently handle expression endpoint children"
 
-        varEndpointCode = self._indent(self._genVariableEndpointAndChildren(varEndpointChild), 2) + self._unindentClassSep
-        varEndpointName = re.findall("class ([^()]*)(\(.*\))?:", varEndpointCode)[0][0]
+        varEndpointName = varEndpointChild.className
 
         parentRef = self._genParentsFromExprAncestorStr(endpoint)
 
-        # TODO: this code is copied; probably should be shared somehow
-        childClassesCode = self._indent(
-            self._genEndpoints(nonVarChildEndpoints))
+        endpointMethodStrs = self._genMethodsCode(endpoint)
 
-        endpointMethodStrs = self._indent("".join(
-            self._methodSep + methodStr
-            for method in endpoint.methods
-            for methodTemplateFn in [
-                _useEndpointMethod_noDataTemplate if method.name in ("get", "delete")
-                else _useEndpointMethod_fullTemplate
-            ]
-            for methodStr in [methodTemplateFn(
-                methodName = method.name,
-                methodDesc = method.desc,
-            )]
-        ))
-
-        schemaInResponseGetters = self._indent(self._methodSep + self._genSchemaInResponseGettersStr(endpoint))
-
-        return _useExpressionEndpointTemplate(
+        schemaInResponseGetters = self._genSchemaInResponseGettersCode(endpoint)
+
+        endpointCode = _useExpressionEndpointTemplate(
             endpointName = endpoint.className,
             parentRef = parentRef,
             urlNameStr = f"'{endpoint.pathName}'",
             pathValueName = varEndpointName,
-            hardenedClassCode = varEndpointCode,
+            hardenedClassCode = _codeSlot,
             hardenedClassName = varEndpointName,
             methodSep = self._methodSep,
             methodsCode = endpointMethodStrs,
-            childClassesCode = childClassesCode,
+            childClassesCode = _codeSlot,
             schemaInResponseGettersCode = schemaInResponseGetters,
         )
+        (beforeVarEndpointCode, beforeChildrenCode, afterChildrenCode) = endpointCode.split(_codeSlot)
+        fragments.append((indentLevel, beforeVarEndpointCode))
+        self._genVariableEndpointAndChildren(varEndpointChild, indentLevel + 2, fragments)
+        fragments.append((indentLevel, self._unindentClassSep + beforeChildrenCode))
+        self._genEndpoints(nonVarChildEndpoints, indentLevel + 1, fragments)
+        fragments.append((indentLevel, afterChildrenCode))
 
-    def _genVariableEndpointAndChildren(self, endpoint: Parser.Endpoint) -> str:
-        childClassesCode = self._indent(self._genEndpoints(endpoint.children))
-
-        endpointMethodStrs = self._indent("".join(
-            self._methodSep + methodStr
-            for method in endpoint.methods
-            for methodTemplateFn in [
-                _useEndpointMethod_noDataTemplate if method.name in ("get", "delete")
-                else _useEndpointMethod_fullTemplate
-            ]
-            for methodStr in [methodTemplateFn(
-                methodName = method.name,
-                methodDesc = method.desc,
-            )]
-        ))
+    def _genVariableEndpointAndChildren(self, endpoint: Parser.Endpoint, indentLevel: int, fragments: _CodeFragments):
+        endpointMethodStrs = self._genMethodsCode(endpoint)
 
         parentRef = self._genParentsFromExprAncestorStr(endpoint)
 
-        schemaInResponseGetters = self._indent(self._methodSep + self._genSchemaInResponseGettersStr(endpoint))
+        schemaInResponseGetters = self._genSchemaInResponseGettersCode(endpoint)
 
-        return _useVariableEndpointTemplate(
+        endpointCode = _useVariableEndpointTemplate(
             endpointName = endpoint.className,
             parentRef = parentRef,
             methodsCode = endpointMethodStrs,
-            childClassesCode = childClassesCode,
+            childClassesCode = _codeSlot,
             schemaInResponseGettersCode = schemaInResponseGetters,
         )
-
-    def _genSchemaInResponseGettersStr(self, endpoint: Parser.Endpoint):
-        methodGet = None
-        methodDelete = None
-        methodPatch = None
-        methodPost = None
-        methodPut = None
+        (beforeChildrenCode, afterChildrenCode) = endpointCode.split(_codeSlot)
+        fragments.append((indentLevel, beforeChildrenCode))
+        self._genEndpoints(endpoint.children, indentLevel + 1, fragments)
+        fragments.append((indentLevel, afterChildrenCode))
+
+    def _genMethodsCode(self, endpoint: Parser.Endpoint) -> str:
+        methodCodeByNameAndDesc = self._methodCodeByNameAndDesc
+        methodStrs = []
         for method in endpoint.methods:
-            if method.name == "get":
-                methodGet = method
-            elif method.name == "delete":
-                methodDelete = method
-            elif method.name == "patch":
-                methodPatch = method
-            elif method.name == "post":
-                methodPost = method
-            elif method.name == "put":
-                methodPut = method
-
-        return _useEndpointSchemaInResponseGettersTemplate(
-            schemaInResponseGet = self._genSchemaInResponseStr(methodGet),
-            schemaInResponseDelete = self._genSchemaInResponseStr(methodDelete),
-            schemaInResponsePatch = self._genSchemaInResponseStr(methodPatch),
-            schemaInResponsePost = self._genSchemaInResponseStr(methodPost),
-            schemaInResponsePut = self._genSchemaInResponseStr(methodPut),
+            methodKey = (method.name, method.desc)
+            methodStr = methodCodeByNameAndDesc.get(methodKey)
+            if methodStr is None:
+                methodTemplateFn = _endpointMethodTemplatesByName.get(method.name, _useEndpointMethod_fullTemplate)
+                methodStr = self._methodSep + methodTemplateFn(
+                    methodName = method.name,
+                    methodDesc = method.desc,
+                )
+                methodCodeByNameAndDesc[methodKey] = methodStr
+            methodStrs.append(methodStr)
+        return self._indent("".join(methodStrs))
+
+    def _genSchemaInResponseGettersCode(self, endpoint: Parser.Endpoint) -> str:
+        methodsByName = {
+            method.name: method
+            for method in endpoint.methods
+        }
+        schemaInResponseStrs = (
+            self._genSchemaInResponseStr(methodsByName.get("delete")),
+            self._genSchemaInResponseStr(methodsByName.get("get")),
+            self._genSchemaInResponseStr(methodsByName.get("patch")),
+            self._genSchemaInResponseStr(methodsByName.get("post")),
+            self._genSchemaInResponseStr(methodsByName.get("put")),
         )
 
+        gettersCode = self._schemaInResponseGettersCodeByStrs.get(schemaInResponseStrs)
+        if gettersCode is None:
+            (deleteStr, getStr, patchStr, postStr, putStr) = schemaInResponseStrs
+            gettersCode = self._indent(self._methodSep + _useEndpointSchemaInResponseGettersTemplate(
+                schemaInResponseDelete = deleteStr,
+                schemaInResponseGet = getStr,
+                schemaInResponsePatch = patchStr,
+                schemaInResponsePost = postStr,
+                schemaInResponsePut = putStr,
+            ))
+            self._schemaInResponseGettersCodeByStrs[schemaInResponseStrs] = gettersCode
+        return gettersCode
+
     def _genSchemaInResponseStr(self, method: Parser.Method):
-        if method is not None:
-            schemaPathsMap = dict()
-            for (responseCode, specKeyPathDescriptor, schemaClassRefStr) in method.allSchemaInResponseJson():
-                if responseCode not in schemaPathsMap:
-                    schemaPathsMap[responseCode] = []
-                # formatted so the string can later be identified and replaced
-                # with an actual class reference
-                formattedSchemaClassRefStr = f"<:{schemaClassRefStr}:>"
-                pathToReplaceWithSchema = (specKeyPathDescriptor, formattedSchemaClassRefStr)
-                schemaPathsMap[responseCode].append(pathToReplaceWithSchema)
-            # replaces "'<schemaClassName>'" --> "schemaClassName"
-            schemaInResponseStr = re.sub(r"'\<:(?P<class>.*?):\>'", r"\g<class>", f"{schemaPathsMap}")
-            return schemaInResponseStr
-        else:
+        if method is None:
             return "{}"
 
+        # the dict literal is written out directly (instead of repr()-ing a dict), since
+        # schema class references need to be written as names, not strings
+        schemaPathStrsByCode = dict()
+        for (responseCode, specKeyPathDescriptor, schemaClassRefStr) in method.allSchemaInResponseJson():
+            pathToReplaceWithSchemaStr = f"({specKeyPathDescriptor!r}, {schemaClassRefStr})"
+            schemaPathStrsByCode.setdefault(responseCode, []).append(pathToReplaceWithSchemaStr)
+        return "{" + ", ".join([
+            f"{responseCode!r}: [{', '.join(schemaPathStrs)}]"
+            for (responseCode, schemaPathStrs) in schemaPathStrsByCode.items()
+        ]) + "}"
 
-    def _genSchema(self, schema: Iterable[Parser.Schema]) -> str:
-        return "".join(
-            self._classSep + schemaCode
-            for model in schema
-            for schemaCode in [self._genSchemaModel(model)]
-        )
+
+    def _genSchema(self, schema: Iterable[Parser.Schema], chunks: list[str]):
+        classSep = self._classSep
+        for model in schema:
+            chunks.append(classSep)
+            chunks.append(self._genSchemaModel(model))
 
     def _genSchemaModel(self, model: Parser.Schema) -> str:
-        propDefsParamsStr = self._indent("\n" + "\n".join(
-            propCode
-            for prop in model.props
-            for propCode in [_usePropParamTemplate(
-                propName = prop.name,
-            )]
-        ), 2) + self._indent("\n", 1)
-        propDefsAssignmentsStr = self._indent("\n".join(
-            propCode
-            for prop in model.props
-            for propCode in [_usePropAssignmentTemplate(
-                propName = prop.name,
+        # the properties are only walked once, filling all three pieces of the template
+        propParamStrs = []
+        propAssignmentStrs = []
+        propSerializeStrs = []
+        propNames = []
+        for prop in model.props:
+            propName = prop.name
+            propParamStrs.append(_usePropParamTemplate(
+                propName = propName,
+            ))
+            propAssignmentStrs.append(_usePropAssignmentTemplate(
+                propName = propName,
                 propDesc = prop.desc,
-            )]
-        ), 2)
-
-        propDefNames = {
-            prop.name
-            for prop in model.props
-        }
+            ))
+            # _serialize() is written out property by property (instead of looping over
+            # _propNames at runtime), since the generator already knows every property
+            propSerializeStrs.append("\n" + _usePropSerializeTemplate(
+                propName = propName,
+            ))
+            propNames.append(propName)
+
+        propDefsParamsStr = self._indent("\n" + "\n".join(propParamStrs), 2) + self._indent("\n", 1)
+        propDefsAssignmentsStr = self._indent("\n".join(propAssignmentStrs), 2)
+        propDefsSerializesStr = self._indent("".join(propSerializeStrs), 2)
+        # a tuple keeps declaration order (and iterates fastest); the
+        # generated class derives its membership frozenset from it
+        propDefNames = tuple(propNames)
 
         return _useSchemaTemplate(
             schemaName = model.name,
@@ -418,33 +479,50 @@ class _EndpointWriter:
             propDefNames = propDefNames,
             propDefsParams = propDefsParamsStr,
             propDefsAssignments = propDefsAssignmentsStr,
+            propDefsSerializes = propDefsSerializesStr,
             methodSep = self._methodSep,
         )
 
-    def _indent(self, code: str, indentLevel: int = 1) -> str:
-        return code.replace("\n", "\n" + self._indentStr * indentLevel)
+    def _indentFragments(self, fragments: _CodeFragments) -> list[str]:
+        indent = self._indent
+        return [
+            indent(code, indentLevel) if indentLevel > 0 else code
+            for (indentLevel, code) in fragments
+        ]
 
-    def _isExpressionEndpoint(self, endpoint: Parser.Endpoint) -> bool:
-        for child in endpoint.children:
-            if self._isVariableEndpoint(child):
-                return True
-        return False
-
-    def _isVariableEndpoint(self, childEndpoint: Parser.Endpoint) -> bool:
-        return (childEndpoint.pathName[0], childEndpoint.pathName[-1]) == ("{", "}")
-
-    def _parentsUpToExprEndpoint(self, endpoint: Parser.Endpoint) -> Iterable[Parser.Endpoint]:
-        currEndpoint = endpoint.parent
-        # even if it is; we want to yield immediate expr endpoint parents for var endpoints
-        currIsExprEndpoint = False
-        while currEndpoint is not None and not currIsExprEndpoint:
-            yield currEndpoint
-            currIsExprEndpoint = self._isVariableEndpoint(currEndpoint)
-            currEndpoint = currEndpoint.parent
+    def _indent(self, code: str, indentLevel: int = 1) -> str:
+        if indentLevel == 1:
+            return code.replace("\n", self._newlineIndent)
+        newlineIndent = self._newlineIndentsByLevel.get(indentLevel)
+        if newlineIndent is None:
+            newlineIndent = "\n" + self._indentStr * indentLevel
+            self._newlineIndentsByLevel[indentLevel] = newlineIndent
+        return code.replace("\n", newlineIndent)
 
     def _genParentsFromExprAncestorStr(self, endpoint: Parser.Endpoint) -> str:
-        ancestry = ".".join(parent.className for parent in reversed(
-            list(self._parentsUpToExprEndpoint(endpoint))))
+        ancestry = self._exprAncestry(endpoint)
         if ancestry == "":
-            ancestry = "None"
+            return "None"
+        return ancestry
+
+    def _exprAncestry(self, endpoint: Parser.Endpoint) -> str:
+        """Returns the dotted class names of `endpoint`'s parents, up to (and including) the closest
+        variable endpoint ancestor, or "" for root endpoints
+
+        Results are cached, so each endpoint extends its parent's ancestry instead of re-walking
+        the whole chain; even if the parent is an expr endpoint, we still want to include it for
+        var endpoints
+        """
+
+        ancestry = self._exprAncestryByEndpoint.get(endpoint)
+        if ancestry is None:
+            parent = endpoint.parent
+            if parent is None:
+                ancestry = ""
+            elif parent.isVariable:
+                ancestry = parent.className
+            else:
+                parentAncestry = self._exprAncestry(parent)
+                ancestry = parent.className if parentAncestry == "" else f"{parentAncestry}.{parent.className}"
+            self._exprAncestryByEndpoint[endpoint] = ancestry
         return ancestry
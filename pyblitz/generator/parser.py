@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Iterable, Any, Union, Callable
+from typing import Iterable, Any, Union
 
 from ..common import _convertDashesToCamelCase
+from ..common.jsoncodec import _loadJson
+
+
+# the HTTP methods pyblitz.http can actually send; path items can hold other keys
+# too (like "parameters", "summary", or "servers"), which aren't endpoint methods
+_httpMethodNames = frozenset(('delete', 'get', 'patch', 'post', 'put'))
 
 
 class ParseError(Exception):
@@ -37,6 +43,8 @@ class Parser(ABC):
         self.__init_called = True
         self.__servers = []
         self.__endpointsDict = dict()
+        # paths usually have several methods, so each path's endpoint is only looked up once
+        self.__endpointsByPathUrl = dict()
         self.__schemaDict = dict()
         self._currSpecDict = None
 
@@ -47,6 +55,15 @@ class Parser(ABC):
         # subclasses should probably assert the openApiSpecDict['openapi'] version
         return # None, but call all relevant _record...() methods
 
+    def parseBytes(self, openApiSpecBytes: Union[bytes, bytearray, memoryview, str]):
+        """Like `parse()`, but takes the raw JSON contents of a spec file instead of an already decoded `dict`
+
+        The JSON is decoded with `orjson` when it's installed, which is much faster (and lighter on memory)
+        than the standard `json` module for big specs.
+        """
+
+        return self.parse(_loadJson(openApiSpecBytes))
+
     @property
     def servers(self):
         return self.__servers
@@ -66,21 +83,28 @@ class Parser(ABC):
         assert type(pathUrl) is str
         assert type(method) is Parser.Method
 
+        endpoint = self.__endpointsByPathUrl.get(pathUrl)
+        if endpoint is not None:
+            endpoint.addMethod(method)
+            return
+
         pathsSplit = pathUrl.split("/")
         if pathsSplit[0] == "":
             pathsSplit.pop(0)
         endpoint = None
         for childName in pathsSplit:
             if endpoint is None:
-                if childName not in self.__endpointsDict:
+                childEndpoint = self.__endpointsDict.get(childName)
+                if childEndpoint is None:
                     childEndpoint = Parser.Endpoint(childName)
                     self.__endpointsDict[childName] = childEndpoint
-                childEndpoint = self.__endpointsDict[childName]
-            else:
-                if not endpoint.hasChild(childName):
-                    childEndpoint = Parser.Endpoint(childName, endpoint)
+            elif endpoint.hasChild(childName):
                 childEndpoint = endpoint.getChildFromName(childName)
+            else:
+                # (adds itself as a child of `endpoint`)
+                childEndpoint = Parser.Endpoint(childName, endpoint)
             endpoint = childEndpoint
+        self.__endpointsByPathUrl[pathUrl] = endpoint
         endpoint.addMethod(method)
 
     def _recordResponseSchema(self, method: 'Parser.Method', responseCodeStr: str, specKeyPathDescriptor: tuple[str, Any], schemaClassRefStr: str):
@@ -92,16 +116,20 @@ class Parser(ABC):
         assert type(schemaDesc) is str
         assert type(prop) is Parser.SchemaProperty
 
-        if schemaName not in self.__schemaDict:
+        schema = self.__schemaDict.get(schemaName)
+        if schema is None:
             schema = Parser.Schema(schemaName, schemaDesc)
             self.__schemaDict[schemaName] = schema
-        schema = self.__schemaDict[schemaName]
         schema.addProp(prop)
 
 
     class Server:
         """A data class representing Server data for the parser"""
 
+        # (these data classes are made once per server/endpoint/method/etc. in a spec, so slots
+        # keep big specs from carrying around thousands of instance dicts)
+        __slots__ = ('_name', '_url', '_desc')
+
         def __init__(self, name: str, url: str, desc: str):
             self._name = name
             self._url = url if url[-1] != "/" else url[:-1]
@@ -123,15 +151,27 @@ class Parser(ABC):
     class Endpoint:
         """A data class representing Endpoint data for the parser"""
 
+        __slots__ = (
+            '_pathName', '_isVariable', '_hasVariableChild', '_className', '_parent',
+            '_pathVersion', '_methodsDict', '_childrenDict', '_path',
+        )
+
+        # changes whenever any endpoint gets a (new) parent, which invalidates cached paths
+        _treeVersion = 0
+
         def __init__(self, pathName: str, parent: 'Parser.Endpoint'=None):
             assert type(pathName) is str
             if parent is not None:
                 assert type(parent) is Parser.Endpoint
             
             self._pathName = pathName
+            # endpoints never change names, so whether they're variable (like "{userId}") is
+            # decided once here, instead of every time the generator asks
+            self._isVariable = pathName.startswith("{") and pathName.endswith("}")
+            self._hasVariableChild = False
             self._className = None
             self._parent = None
-            self._lastParentOnPathCheck = None
+            self._pathVersion = None
             self._methodsDict = dict()
             self._childrenDict = dict()
             self._path = None
@@ -146,12 +186,19 @@ class Parser(ABC):
         def pathName(self) -> str:
             return self._pathName
 
+        @property
+        def isVariable(self) -> bool:
+            return self._isVariable
+
+        @property
+        def isExpression(self) -> bool:
+            return self._hasVariableChild
+
         @property
         def className(self) -> str:
             if self._className is None:
-                nameNoBraces = self._pathName[1:-1] if self._pathName[0] == "{" else self._pathName
-                casedName = _convertDashesToCamelCase(nameNoBraces)
-                self._className = casedName
+                nameNoBraces = self._pathName[1:-1] if self._isVariable else self._pathName
+                self._className = _convertDashesToCamelCase(nameNoBraces)
             return self._className
 
         @property
@@ -159,10 +206,12 @@ class Parser(ABC):
             return self._parent
 
         def getPath(self) -> str:
-            if self._path is None or self._lastParentOnPathCheck is not self._parent:
+            # any re-parenting (of this endpoint or of an ancestor) bumps the tree version,
+            # so a path built for an older version might be stale
+            if self._pathVersion != Parser.Endpoint._treeVersion:
                 parentPath = self._parent.getPath() if self._parent is not None else ""
                 self._path = parentPath + "/" + self._pathName
-                self._lastParentOnPathCheck = self._parent
+                self._pathVersion = Parser.Endpoint._treeVersion
             return self._path
 
         # CHILDREN ENDPOINTS
@@ -174,7 +223,10 @@ class Parser(ABC):
         def addChild(self, childEndpoint: 'Parser.Endpoint') -> None:
             assert type(childEndpoint) is Parser.Endpoint
             childEndpoint._parent = self
+            Parser.Endpoint._treeVersion += 1
             self._childrenDict[childEndpoint.pathName] = childEndpoint
+            if childEndpoint._isVariable:
+                self._hasVariableChild = True
 
         def hasChild(self, childEndpointName: str) -> bool:
             return childEndpointName in self._childrenDict
@@ -202,6 +254,8 @@ class Parser(ABC):
     class Method:
         """A data class representing Method data for the parser"""
 
+        __slots__ = ('_name', '_desc', '_responseSchemasByCode')
+
         def __init__(self, name: str, desc: str):
             assert type(name) is str
             assert type(desc) is str
@@ -234,6 +288,8 @@ class Parser(ABC):
     class Schema:
         """A data class representing a Schema model for the parser"""
 
+        __slots__ = ('_name', '_desc', '_properties')
+
         def __init__(self, name: str, desc: str):
             assert type(name) is str
             assert type(desc) is str
@@ -268,6 +324,8 @@ class Parser(ABC):
     class SchemaProperty:
         """A data class representing a SchemaProperty for the parser"""
 
+        __slots__ = ('_name', '_desc')
+
         def __init__(self, name: str, desc: str):
             assert type(name) is str
             assert type(desc) is str
@@ -288,38 +346,47 @@ class Parser_3_1_0(Parser):
     def __init__(self):
         super().__init__()
         self._currSpecDict = None
+        # the spec never changes while it's being parsed, so each "$ref" path only needs to be resolved once
+        self._refObjsByPath = dict()
     
     def parse(self, openApiSpecDict: dict):
         super().parse(openApiSpecDict)
         assert openApiSpecDict['openapi'] == "3.1.0", \
             "Parser_3_1_0 is intended to only work with version 3.1.0 specifications"
+        self._refObjsByPath = dict() # (refs from any previously parsed spec don't apply anymore)
 
         serverList = self._currSpecDict['servers']
-        for (server, idx) in zip(serverList, range(len(serverList))):
+        for (idx, server) in enumerate(serverList):
             name = server['description'] or f"NO_NAME_FOUND_{idx + 1}"
             url = server['url']
             server = Parser.Server(name, url, f"Your description for '{name}' here")
             self._recordServer(server)
         
+        recordSchemaProperty = self._recordSchemaProperty
         for (schemaName, schemaData) in self._currSpecDict['components']['schemas'].items():
+            schemaDesc = schemaData.get('description', "")
             for (propName, propData) in schemaData['properties'].items():
                 prop = Parser.SchemaProperty(propName, propData.get('description', ""))
-                self._recordSchemaProperty(schemaName, schemaData.get('description', ""), prop)
+                recordSchemaProperty(schemaName, schemaDesc, prop)
 
+        # (these are used for every method/response of every path, so they're only looked up once)
+        recordMethod = self._recordMethod
+        evalRefsAndGetValue = self._evalRefsAndGetValue
+        scanForSchemaRefs = self._scanForSchemaRefs
         for (pathUrl, path) in self._currSpecDict['paths'].items():
-            for (method, methodData) in path.items():
-                isActuallyMethod = method != 'parameters'
+            for (methodName, methodData) in path.items():
+                isActuallyMethod = methodName in _httpMethodNames
                 if isActuallyMethod:
-                    method = Parser.Method(method, self._genEndpointDesc(methodData))
-                    self._recordMethod(pathUrl, method)
+                    method = Parser.Method(methodName, self._genEndpointDesc(methodData))
+                    recordMethod(pathUrl, method)
 
                     for (responseCode, responseSpecData) in methodData['responses'].items():
                         try:
-                            responseJsonSpecData = self._evalRefsAndGetValue(responseSpecData, ('content', 'application/json', 'schema'))
+                            responseJsonSpecData = evalRefsAndGetValue(responseSpecData, ('content', 'application/json', 'schema'))
                         except KeyError:
                             # no content to try to parse! (Or not application/json, so still no schema...)
                             continue # to avoid scanning for schema that can't exist
-                        self._scanForSchemaRefs(method, responseCode, responseJsonSpecData)
+                        scanForSchemaRefs(method, responseCode, responseJsonSpecData)
 
     def _evalRefsAndGetValue(self, currSpecObject, specKeyPath: Union[tuple[Any], str]):
         """
@@ -328,20 +395,13 @@ class Parser_3_1_0(Parser):
 
         """
         
-        if len(specKeyPath) == 0:
-            return currSpecObject
-        
-        if type(currSpecObject) is dict:
-            lastSpecObject = None
-            lastSpecObjectWasRefObject = True # base case; benign if this isn't actually true
-            while lastSpecObjectWasRefObject:
-                lastSpecObject = currSpecObject
+        # (walked with a loop, not recursion, so each key doesn't cost a call and a path slice)
+        for specKey in specKeyPath:
+            # refs can point at other refs, so they're evaluated until a "real" object is found
+            while type(currSpecObject) is dict and '$ref' in currSpecObject:
                 currSpecObject = self._evalRefObj(currSpecObject)
-                # this is true because _evalRefObj() short-circuits when given a non-ref object
-                lastSpecObjectWasRefObject = lastSpecObject is not currSpecObject
-        
-        currSpecObject = currSpecObject[specKeyPath[0]]
-        return self._evalRefsAndGetValue(currSpecObject, specKeyPath[1:])
+            currSpecObject = currSpecObject[specKey]
+        return currSpecObject
 
     def _evalRefObj(self, refObj):
         """
@@ -352,48 +412,62 @@ class Parser_3_1_0(Parser):
 
         if type(refObj) is dict and '$ref' in refObj:
             refPath = refObj['$ref']
+            if refPath in self._refObjsByPath:
+                return self._refObjsByPath[refPath]
             refPathKeys = refPath.split("/")
             assert refPathKeys[0] == "#", "Unhandled case where $ref does not reference own spec"
             refPathKeys_skippingHash = refPathKeys[1:]
-            return self._evalRefsAndGetValue(self._currSpecDict, refPathKeys_skippingHash)
+            evaluatedObj = self._evalRefsAndGetValue(self._currSpecDict, refPathKeys_skippingHash)
+            self._refObjsByPath[refPath] = evaluatedObj
+            return evaluatedObj
         else:
             return refObj
 
-    def _scanForSchemaRefs(self, method, responseCode: str, currSpecObject, currSpecKeyPathDescriptor: tuple[tuple[str, Any]] = tuple()):
+    def _scanForSchemaRefs(self, method, responseCode: str, responseSpecObject):
         """
-        Given an object from the specs, this function will recursively record
-        the paths of Schemas in the responses of a specific response code from
-        a certain HTTP method call
+        Given an object from the specs, this function will record the paths of
+        Schemas (nested any number of levels deep) in the responses of a specific
+        response code from a certain HTTP method call
         """
-        
-        isRefObject = self._evalRefObj(currSpecObject) is not currSpecObject
-        if isRefObject:
-            refPath = currSpecObject['$ref']
-            refPathKeys = refPath.split("/")
-            refType = refPathKeys[2]
-            if refType == "schemas":
-                schemaClassRefStr = refPathKeys[-1]
-                self._recordResponseSchema(method, responseCode, currSpecKeyPathDescriptor, schemaClassRefStr)
-                return # to avoid parsing properties belonging to the schema
-        
-        def scanForSchemaRefsWithContext(nextSpecObject: Any, nextSpecKeyPathDescriptor: tuple[tuple[str, Any]]):
-            self._scanForSchemaRefs(method, responseCode, nextSpecObject, nextSpecKeyPathDescriptor)
-        self._scanAndEvalOpenApiObj(currSpecObject, currSpecKeyPathDescriptor, scanForSchemaRefsWithContext)
-    
-    def _scanAndEvalOpenApiObj(self, currSpecObject, currSpecKeyPathDescriptor: tuple[tuple[str, Any]], callbackForEachItem: Callable[[Any, tuple[tuple[str, Any]]], None]):
-        currSpecObject = self._evalRefObj(currSpecObject)
 
+        # objects are scanned off of a stack (instead of recursively), so deeply nested
+        # responses can't hit the recursion limit; items are pushed in reverse so they're
+        # still recorded in the order they appear in the spec
+        specObjectsToScan = [(responseSpecObject, tuple())]
+        while len(specObjectsToScan) > 0:
+            (currSpecObject, currSpecKeyPathDescriptor) = specObjectsToScan.pop()
+
+            isRefObject = type(currSpecObject) is dict and '$ref' in currSpecObject
+            if isRefObject:
+                refPath = currSpecObject['$ref']
+                refPathKeys = refPath.split("/")
+                assert refPathKeys[0] == "#", "Unhandled case where $ref does not reference own spec"
+                refType = refPathKeys[2]
+                if refType == "schemas":
+                    schemaClassRefStr = refPathKeys[-1]
+                    self._recordResponseSchema(method, responseCode, currSpecKeyPathDescriptor, schemaClassRefStr)
+                    continue # to avoid parsing properties belonging to the schema
+                # (evaluated here, since this is the only place that knows it's a ref object)
+                currSpecObject = self._evalRefObj(currSpecObject)
+
+            nextSpecItems = self._openApiObjItems(currSpecObject, currSpecKeyPathDescriptor)
+            specObjectsToScan.extend(reversed(nextSpecItems))
+    
+    def _openApiObjItems(self, currSpecObject, currSpecKeyPathDescriptor: tuple[tuple[str, Any]]) -> list[tuple[Any, tuple[tuple[str, Any]]]]:
+        """Returns (specObject, specKeyPathDescriptor) pairs for every item directly inside the given
+        (already ref-evaluated) spec object"""
         objectType = currSpecObject.get('type')
         if objectType == 'object':
-            for (newSpecKey, newSpecObject) in currSpecObject['properties'].items():
-                newSpecKeyPathDescriptor = currSpecKeyPathDescriptor + (('object', newSpecKey),)
-                callbackForEachItem(newSpecObject, newSpecKeyPathDescriptor)
+            return [
+                (newSpecObject, currSpecKeyPathDescriptor + (('object', newSpecKey),))
+                for (newSpecKey, newSpecObject) in currSpecObject['properties'].items()
+            ]
         elif objectType == 'array':
             nextSpecObject = currSpecObject['items']
             newSpecKeyPathDescriptor = currSpecKeyPathDescriptor + (('array', slice(None)),)
-            callbackForEachItem(nextSpecObject, newSpecKeyPathDescriptor)
+            return [(nextSpecObject, newSpecKeyPathDescriptor)]
         elif objectType in ('string', 'number', 'integer', 'boolean'):
-            pass # these objects can't contain Schema
+            return [] # these objects can't contain Schema
         else:
             raise ValueError(f"Scanning OpenAPI spec revealed an object with an invalid type: {objectType}")
 
@@ -1,4 +1,11 @@
 from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None # only needed by acceptMsgpack()
 
 from ..common import Endpoint
 from .requests import Request
@@ -12,17 +19,91 @@ def throttle(requestRateSecs: int):
     _requestThrottler.setThrottle(requestRateSecs)
 
 
+def setStreaming(enabled: bool):
+    """Sets whether response bodies are downloaded when they are first used, instead of right away
+
+    This lets `Response.streamItems()` parse big bodies straight off of the connection. Connections
+    are only reused once their body has been read, so streamed responses should always be used.
+    """
+
+    _NetworkState.session.stream = enabled
+
+
+def acceptMsgpack(enabled: bool):
+    """Sets whether servers are asked for MessagePack response bodies (falling back to json)
+
+    MessagePack bodies are smaller and faster to parse than json ones, especially for lots of
+    numbers. Responses still work the same either way. This requires the `msgpack` package.
+    """
+
+    if enabled:
+        if msgpack is None:
+            raise RuntimeError("http.acceptMsgpack() requires the `msgpack` package (install pyblitz[msgpack])")
+        _NetworkState.session.headers["Accept"] = "application/msgpack, application/json;q=0.9"
+    else:
+        # the Session's default
+        _NetworkState.session.headers["Accept"] = "*/*"
+
+
+def configurePool(maxsize: int = 64, retries: int = 3):
+    """Sets how many connections (per server) are kept open for reuse, and how many times
+    requests that fail with a gateway error (502, 503, or 504) are retried before giving up
+
+    This can be called any number of times at any point while your program is running.
+    """
+
+    _mountAdapter(_NetworkState.session, maxsize, retries)
+
+
+def _createSession():
+    """Creates the shared Session, with a connection pool sized for scripts hammering one server"""
+    session = Session()
+    # the Session already sends keep-alive and gzip/deflate headers by default
+    _mountAdapter(session, 64, 3)
+    return session
+
+def _mountAdapter(session: Session, poolMaxsize: int, retries: int):
+    # the adapters being replaced would otherwise keep their pooled connections open
+    for prefix in ("http://", "https://"):
+        oldAdapter = session.adapters.get(prefix)
+        if oldAdapter is not None:
+            oldAdapter.close()
+
+    # transient gateway errors are retried (with backoff) instead of being handed to the caller;
+    # urllib3 only retries idempotent methods by default, so POST and PATCH never are
+    if retries == 0:
+        # a Retry(total=0) would still treat gateway errors as retries that ran out
+        maxRetries = 0
+    else:
+        maxRetries = Retry(
+            total=retries,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            # once retries run out, the last bad response is still returned (so its
+            # status can be checked) instead of raising a RetryError
+            raise_on_status=False,
+            # a server asking to wait a long time shouldn't silently block the caller
+            respect_retry_after_header=False,
+        )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=poolMaxsize, max_retries=maxRetries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
 class _NetworkState:
     isAuthed = False
     activeServer = None
+    # (isAuthed and activeServer is not None), kept up to date so requests only check one flag
+    isReady = False
     servers = dict()
-    session = Session()
+    session = _createSession()
 
 
 def registerServer(name, url, desc=""):
     """Records data for a server that can later be activated by `setActiveServer(name)`"""
-    if url[-1] == "/":
-        url.pop()
+    # trimmed once here, so requests can always just append the endpoint's url
+    if url.endswith("/"):
+        url = url[:-1]
     _NetworkState.servers[name] = url
 
 def getServer(name):
@@ -40,9 +121,11 @@ def setActiveServer(name):
     Requests will always be made to the server that was last activated by this function.
     """
 
-    if name not in _NetworkState.servers:
+    server = _NetworkState.servers.get(name)
+    if server is None:
         raise ValueError(f"Server '{name}' is not registered!")
-    _NetworkState.activeServer = _NetworkState.servers[name]
+    _NetworkState.activeServer = server
+    _NetworkState.isReady = _NetworkState.isAuthed
 
 
 def setAuth(token):
@@ -52,68 +135,80 @@ def setAuth(token):
     Requests will always use the token that was last recorded by this function.
     """
 
-    _NetworkState.session.headers.update({
-        "authorization": f"Bearer {token}",
-    })
+    # set directly (the Session sends its headers with every request, so this is the only place it's built)
+    _NetworkState.session.headers["authorization"] = f"Bearer {token}"
     _NetworkState.isAuthed = True
+    _NetworkState.isReady = _NetworkState.activeServer is not None
 
 
-def _authenticated(fn):
-    """A decorator that ensures calls made to an HTTP method are both authenticated and have a target server"""
-    def authedFn(*args, **kwargs):
-        if _NetworkState.activeServer is None:
-            raise RuntimeError("Cannot make network requests until a server is chosen via pyblitz.http.setActiveServer()")
-        if not _NetworkState.isAuthed:
-            raise RuntimeError("Cannot make network requests until authentication is set with pyblitz.http.setAuth()")
-        return fn(*args, **kwargs)
-    return authedFn
+def _checkAuthenticated():
+    """Ensures calls made to an HTTP method are both authenticated and have a target server
+
+    (Each HTTP method first checks `_NetworkState.isReady` itself, and only calls this to find
+    out what's wrong, so ready requests don't pay for an extra call.)
+    """
+
+    if _NetworkState.activeServer is None:
+        raise RuntimeError("Cannot make network requests until a server is chosen via pyblitz.http.setActiveServer()")
+    if not _NetworkState.isAuthed:
+        raise RuntimeError("Cannot make network requests until authentication is set with pyblitz.http.setAuth()")
 
 
-@_authenticated
-def delete(endpoint: Endpoint, headers=dict(), data=None, **params) -> Response:
-    _checkIsEndpoint(endpoint)
-    fullUrl = _NetworkState.activeServer + endpoint.url()
+def delete(endpoint: Endpoint, headers=None, data=None, **params) -> Response:
+    if not _NetworkState.isReady:
+        _checkAuthenticated()
+    fullUrl = _fullUrl(endpoint)
     request = Request.Delete(fullUrl)
     request.load(data, headers, params)
     httpResponse = _requestThrottler.sendRequest(request)
-    return Response(httpResponse, endpoint.schemaInResponseJson("DELETE"))
+    return Response(httpResponse, endpoint.schemaInResponseJson("DELETE"), _NetworkState.session.stream)
 
-@_authenticated
-def get(endpoint: Endpoint, headers=dict(), data=None, **params) -> Response:
-    _checkIsEndpoint(endpoint)
-    fullUrl = _NetworkState.activeServer + endpoint.url()
+def get(endpoint: Endpoint, headers=None, data=None, **params) -> Response:
+    if not _NetworkState.isReady:
+        _checkAuthenticated()
+    fullUrl = _fullUrl(endpoint)
     request = Request.Get(fullUrl)
     request.load(data, headers, params)
     httpResponse = _requestThrottler.sendRequest(request)
-    return Response(httpResponse, endpoint.schemaInResponseJson("GET"))
+    return Response(httpResponse, endpoint.schemaInResponseJson("GET"), _NetworkState.session.stream)
 
-@_authenticated
-def patch(endpoint: Endpoint, data, headers=dict(), **params) -> Response:
-    _checkIsEndpoint(endpoint)
-    fullUrl = _NetworkState.activeServer + endpoint.url()
+def patch(endpoint: Endpoint, data, headers=None, **params) -> Response:
+    if not _NetworkState.isReady:
+        _checkAuthenticated()
+    fullUrl = _fullUrl(endpoint)
     request = Request.Patch(fullUrl)
     request.load(data, headers, params)
     httpResponse = _requestThrottler.sendRequest(request)
-    return Response(httpResponse, endpoint.schemaInResponseJson("PATCH"))
+    return Response(httpResponse, endpoint.schemaInResponseJson("PATCH"), _NetworkState.session.stream)
 
-@_authenticated
-def post(endpoint: Endpoint, data, headers=dict(), **params) -> Response:
-    _checkIsEndpoint(endpoint)
-    fullUrl = _NetworkState.activeServer + endpoint.url()
+def post(endpoint: Endpoint, data, headers=None, **params) -> Response:
+    if not _NetworkState.isReady:
+        _checkAuthenticated()
+    fullUrl = _fullUrl(endpoint)
     request = Request.Post(fullUrl)
     request.load(data, headers, params)
     httpResponse = _requestThrottler.sendRequest(request)
-    return Response(httpResponse, endpoint.schemaInResponseJson("POST"))
+    return Response(httpResponse, endpoint.schemaInResponseJson("POST"), _NetworkState.session.stream)
 
-@_authenticated
-def put(endpoint: Endpoint, data, headers=dict(), **params) -> Response:
-    _checkIsEndpoint(endpoint)
-    fullUrl = _NetworkState.activeServer + endpoint.url()
+def put(endpoint: Endpoint, data, headers=None, **params) -> Response:
+    if not _NetworkState.isReady:
+        _checkAuthenticated()
+    fullUrl = _fullUrl(endpoint)
     request = Request.Put(fullUrl)
     request.load(data, headers, params)
     httpResponse = _requestThrottler.sendRequest(request)
-    return Response(httpResponse, endpoint.schemaInResponseJson("PUT"))
+    return Response(httpResponse, endpoint.schemaInResponseJson("PUT"), _NetworkState.session.stream)
+
+def _fullUrl(endpoint: Endpoint) -> str:
+    try:
+        endpointUrl = endpoint.url()
+    except AttributeError:
+        # the endpoint is only validated once something has gone wrong, which keeps
+        # the check off of the path every (valid) request takes
+        _checkIsEndpoint(endpoint)
+        raise
+    return _NetworkState.activeServer + endpointUrl
 
 def _checkIsEndpoint(endpoint):
-    if not issubclass(endpoint, Endpoint):
+    if not (isinstance(endpoint, type) and issubclass(endpoint, Endpoint)):
         raise ValueError("http methods must be given a pyblitz.Endpoint for argument `endpoint`")
@@ -1,84 +1,115 @@
-import json
+from functools import singledispatch
 from typing import Callable, Union
 
 from ..common import Schema
+from ..common.jsoncodec import _dumpJson
 
 
-_fromAuthorizedMethodKey = object()
+# shared by every request with a json body; never mutate this!
+_jsonContentHeaders = {"Content-Type": "application/json"}
+
+# the `default` hook for json dumps; dispatching on the type is a dict lookup (instead
+# of an isinstance() chain) and raises properly even when asserts are stripped by -O
+@singledispatch
+def _serializeDefault(obj):
+    raise TypeError(f"Object of type {type(obj).__name__} is not json serializable")
+
+@_serializeDefault.register
+def _(obj: Schema):
+    return obj.serialize()
 
 class Request:
     def __init__(self, *args, **kwargs):
-        if len(args) == 0 or args[0] is not _fromAuthorizedMethodKey:
-            raise RuntimeError("Cannot initialize Request() directly;\
-                use a @classmethod constructor instead for the http call you want to make")
-        self.__authorized_init__(*args, **kwargs)
+        raise RuntimeError("Cannot initialize Request() directly;\
+            use a @classmethod constructor instead for the http call you want to make")
 
-    def __authorized_init__(self, fromAuthorizedMethodKey, toUrl: str, httpMethodFn: Callable):
-        assert fromAuthorizedMethodKey is _fromAuthorizedMethodKey, "Invalid call made to create Request()"
+    @classmethod
+    def _build(cls, toUrl: str, httpMethodFn: Callable):
+        # skips __init__() (which only exists to stop outside callers) instead of checking
+        # a secret key argument every time a request is made
+        self = cls.__new__(cls)
         self._url = toUrl
         self._methodFn = httpMethodFn
         self._loaded = False
+        return self
 
     @classmethod
     def Delete(cls, toUrl: str):
-        self = cls(_fromAuthorizedMethodKey, toUrl, cls._getSession().delete)
-        return self
+        return cls._build(toUrl, cls._getSession().delete)
 
     @classmethod
     def Get(cls, toUrl: str):
-        self = cls(_fromAuthorizedMethodKey, toUrl, cls._getSession().get)
-        return self
+        return cls._build(toUrl, cls._getSession().get)
 
     @classmethod
     def Patch(cls, toUrl: str):
-        self = cls(_fromAuthorizedMethodKey, toUrl, cls._getSession().patch)
-        return self
+        return cls._build(toUrl, cls._getSession().patch)
 
     @classmethod
     def Post(cls, toUrl: str):
-        self = cls(_fromAuthorizedMethodKey, toUrl, cls._getSession().post)
-        return self
+        return cls._build(toUrl, cls._getSession().post)
 
     @classmethod
     def Put(cls, toUrl: str):
-        self = cls(_fromAuthorizedMethodKey, toUrl, cls._getSession().put)
-        return self
+        return cls._build(toUrl, cls._getSession().put)
+
+    # the network module imports this one, so it can't be imported at the top of the file;
+    # it's imported on first use and then kept here so later requests skip the import machinery
+    _NetworkState = None
 
     @classmethod
-    def _getSession(self):
-        from .network import _NetworkState
-        return _NetworkState.session
+    def _getSession(cls):
+        if Request._NetworkState is None:
+            from .network import _NetworkState
+            Request._NetworkState = _NetworkState
+        return Request._NetworkState.session
 
-    def load(self, data: Union[str, dict, Schema], headers: dict, params: dict):
+    def load(self, data: Union[str, dict, Schema, bytes, bytearray], headers: Union[dict, None], params: dict):
         """Loads data, headers, and query parameters into this Request
 
-        `data` can be many things, but ultimately it must be converted down to a string
+        `data` can be many things, but ultimately it must be converted down to bytes
         to pass into the inner http request. Currently this function supports `data` of types
-        `str`, `dict`, or `Schema`.
+        `str`, `dict`, or `Schema`. `str` data is treated as already-serialized json (it's only
+        encoded, not dumped again), and `bytes`/`bytearray` data is treated as an already-encoded
+        body and sent as-is (useful for encoding a body once and sending it many times).
+
+        When `orjson` is installed, it's used to dump `data`, with one difference from the json
+        module: `nan` and `inf` floats are sent as `null` (instead of as `NaN` and `Infinity`,
+        which aren't valid json anyway). To send those as-is, pass `data` as an already-dumped `str`.
+
+        `headers` can be `None` when no extra headers (besides the Session's) are needed.
         """
         
-        self._headers = headers
         self._params = params
         
-        data = self._manipulateDataToStr(data)
-        assert type(data) is str
-        self._dataStr = data
+        if isinstance(data, (bytes, bytearray)):
+            self._dataBytes = bytes(data)
+            self._headers = headers
+        else:
+            data = self._manipulateDataToBytes(data)
+            assert type(data) is bytes
+            self._dataBytes = data
+            if len(data) > 0:
+                if headers is None:
+                    self._headers = _jsonContentHeaders
+                else:
+                    # copied so the caller's headers dict is never mutated
+                    self._headers = {**_jsonContentHeaders, **headers}
+            else:
+                self._headers = headers
         self._loaded = True
 
-    def _manipulateDataToStr(self, data):
-        """There is one goal: convert `data` into a meaningful http request string (recursively!)"""
+    def _manipulateDataToBytes(self, data):
+        """There is one goal: convert `data` into a meaningful http request body (recursively!)"""
         if data is None:
-            data = ""
+            data = b""
+        elif isinstance(data, str):
+            # dumping a str again would just wrap the (already serialized) json in quotes
+            data = data.encode()
         else:
-            data = json.dumps(data, default=self._serializeFn, sort_keys=True)
+            data = _dumpJson(data, _serializeDefault)
         return data
 
-    def _serializeFn(self, obj):
-        if isinstance(obj, Schema):
-            return obj.serialize()
-        else:
-            assert "this" is "not handled", "Unconsidered serialize case"
-
     def send(self):
         assert self._loaded, "Cannot send request before calling load()"
-        return self._methodFn(self._url, data=self._dataStr, headers=self._headers, params=self._params)
+        return self._methodFn(self._url, data=self._dataBytes, headers=self._headers, params=self._params)
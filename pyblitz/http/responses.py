@@ -1,27 +1,73 @@
+import io
 import requests
-import json
-from typing import Any
+from typing import Any, Callable, Iterator, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None # msgpack bodies are only sent by servers when asked for (see pyblitz.http.acceptMsgpack())
+
+try:
+    import ijson
+except ImportError:
+    ijson = None # only needed by Response.streamItems()
 
 from ..common import Schema
+from ..common.jsoncodec import _loadJson
 
 
 class Response:
-    def __init__(self, response: requests.Response, jsonSchemaPathsFromCodes: dict[int, list[tuple[tuple, type]]]):
+    def __init__(self, response: requests.Response, jsonSchemaPathsFromCodes: dict[int, list[tuple[tuple, type]]], isStreamed: bool = False):
         self._response = response
-        # TODO: what if it's not a json repsonse?
-        self._jsonDict = json.loads(response.text)
-        self._transformedJsonDict = json.loads(response.text)
-        
+        # (see streamItems()) whether the body is still waiting on the connection, and whether
+        # it has since been read from there (which leaves nothing behind to read again)
+        self._isStreamed = isStreamed
+        self._wasBodyRead = False
+        self._wasRawBodyStreamed = False
+        # the body is only parsed (and transformed) once something actually asks for
+        # it, since plenty of callers only ever check the status
         code = self._response.status_code
-        jsonSchemaPathList = jsonSchemaPathsFromCodes.get(code, [])
-        for (pathKeyDescriptors, schemaClass) in jsonSchemaPathList:
-            self._transformSchema(pathKeyDescriptors, schemaClass)
+        self._jsonSchemaPathList = jsonSchemaPathsFromCodes.get(code, [])
+        # cached by hand (instead of with functools.cached_property, which makes every
+        # Response in every thread wait on the same lock); at worst, two threads racing
+        # to parse the same body just both parse it
+        self._jsonDict = None
+        self._transformedJsonDict = None
+
+    def _getJsonDict(self):
+        if self._jsonDict is None:
+            self._jsonDict = self._parseBody()
+        return self._jsonDict
+
+    def _getTransformedJsonDict(self):
+        if self._transformedJsonDict is None:
+            if len(self._jsonSchemaPathList) == 0:
+                # nothing gets transformed, so both dicts can be the same one
+                self._transformedJsonDict = self._getJsonDict()
+            else:
+                # schema are swapped in place, so transform() needs its own (untouched) dict; parsing
+                # the body again is still much faster than a copy.deepcopy()
+                transformedJsonDict = self._parseBody()
+                for (pathKeyDescriptors, schemaClass) in self._jsonSchemaPathList:
+                    self._transformSchema(pathKeyDescriptors, schemaClass, transformedJsonDict)
+                self._transformedJsonDict = transformedJsonDict
+        return self._transformedJsonDict
+
+    def _parseBody(self):
+        if self._wasRawBodyStreamed:
+            raise RuntimeError("This response's body was already streamed by Response.streamItems(), so it can't be read again")
+        self._wasBodyRead = True
+        # TODO: what if it's not a json (or msgpack) repsonse?
+        if msgpack is not None and self._response.headers.get("Content-Type", "").startswith("application/msgpack"):
+            return msgpack.unpackb(self._response.content, raw=False)
+        # parsing the raw bytes skips decoding the body into an intermediate str
+        return _loadJson(self._response.content)
 
     def __repr__(self):
-        return f"Response{repr(self._transformedJsonDict)}"
+        return f"Response{repr(self._getTransformedJsonDict())}"
 
     def __getitem__(self, key):
-        return self._transformedJsonDict[key]
+        return self._getTransformedJsonDict()[key]
 
     @property
     def status(self):
@@ -29,24 +75,55 @@ class Response:
 
     @property
     def keys(self):
-        return self._transformedJsonDict.keys()
+        return self._getTransformedJsonDict().keys()
 
     @property
     def values(self):
-        return self._transformedJsonDict.values()
+        return self._getTransformedJsonDict().values()
 
     @property
     def items(self):
-        return self._transformedJsonDict.items()
+        return self._getTransformedJsonDict().items()
 
     def transform(self, transformFn):
-        return transformFn(self._jsonDict)
+        return transformFn(self._getJsonDict())
 
-    def _transformSchema(self, pathKeyDescriptors: tuple[tuple[str, Any]], schemaClass: type, startJsonItem = None):
+    def streamItems(self, prefix: str, schemaClass: Union[type[Schema], None] = None) -> Iterator:
+        """Yields the json items found at `prefix` one at a time, without parsing the whole body
+
+        `prefix` uses `ijson`'s syntax; for example, "users.item" yields each item in the body's
+        "users" array. If `schemaClass` is given, items are yielded as instances of it instead.
+        When the body hasn't been downloaded yet (see `pyblitz.http.setStreaming()`), it is read
+        from the connection as it's parsed, so it can only be used once (by this or anything else).
         """
-        Given a "path", a destination schema class, and optionally the json item
-        to work with, this function will inflate JSON data to actual Schema
-        instances
+
+        if ijson is None:
+            raise RuntimeError("Response.streamItems() requires the `ijson` package (install pyblitz[stream])")
+        if self._wasRawBodyStreamed:
+            raise RuntimeError("This response's body was already streamed by Response.streamItems(), so it can't be read again")
+        
+        if self._isStreamed and not self._wasBodyRead:
+            bodyFile = self._response.raw
+            # lets the raw stream undo gzip/deflate encoding like .content would have
+            bodyFile.decode_content = True
+            self._wasRawBodyStreamed = True
+        else:
+            bodyFile = io.BytesIO(self._response.content)
+        return self._iterStreamedItems(bodyFile, prefix, schemaClass)
+
+    def _iterStreamedItems(self, bodyFile, prefix: str, schemaClass: Union[type[Schema], None]):
+        # kept separate from streamItems() so its errors are raised when it's called,
+        # and not whenever the first item happens to be asked for
+        for jsonItem in ijson.items(bodyFile, prefix, use_float=True):
+            if schemaClass is not None:
+                yield schemaClass.fromSerialized(jsonItem)
+            else:
+                yield jsonItem
+
+    def _transformSchema(self, pathKeyDescriptors: tuple[tuple[str, Any]], schemaClass: type, startJsonItem):
+        """
+        Given a "path", a destination schema class, and the json item to work
+        with, this function will inflate JSON data to actual Schema instances
 
         A "path" is defined as a list of key descriptors. A key descriptor is a
         two-tuple of the type of access being made, and the key to use for the
@@ -71,43 +148,49 @@ class Response:
         ```
         """
         
-        if startJsonItem is None:
-            startJsonItem = self._transformedJsonDict
-        
-        currJsonItem = startJsonItem
-        for (descriptorIdx, (itemType, itemKey)) in enumerate(pathKeyDescriptors[:-1]):
-            if itemType == 'object':
-                currJsonItem = currJsonItem[itemKey]
-            elif itemType == 'array':
-                restOfPath = pathKeyDescriptors[descriptorIdx + 1 :]
-                for nextJsonItem in currJsonItem[itemKey]:
-                    self._transformSchema(restOfPath, schemaClass, nextJsonItem)
-                # since the call above handled the rest of the path for each
-                # nextJsonItem, we are done here
-                return
+        # looked up once here, instead of once for every schema in an array
+        fromSerialized = schemaClass.fromSerialized
+        deserializeSchema = self._deserializeSchema
+
+        # walked with a stack (instead of recursing) so deeply nested arrays can't
+        # hit the recursion limit; each entry is a json item and the rest of the
+        # path that still needs to be followed from it
+        jsonItemsAndPaths = [(startJsonItem, pathKeyDescriptors)]
+        while len(jsonItemsAndPaths) > 0:
+            (currJsonItem, currPathKeyDescriptors) = jsonItemsAndPaths.pop()
+            for (descriptorIdx, (itemType, itemKey)) in enumerate(currPathKeyDescriptors[:-1]):
+                if itemType == 'object':
+                    currJsonItem = currJsonItem[itemKey]
+                elif itemType == 'array':
+                    restOfPath = currPathKeyDescriptors[descriptorIdx + 1 :]
+                    for nextJsonItem in currJsonItem[itemKey]:
+                        jsonItemsAndPaths.append((nextJsonItem, restOfPath))
+                    # the rest of the path is followed for each nextJsonItem
+                    # once it's popped off the stack, so we are done here
+                    break
+                else:
+                    raise ValueError(f"Unknown path list item type: {itemType}")
             else:
-                raise ValueError(f"Unknown path list item type: {itemType}")
-
-        (lastItemType, lastItemKey) = pathKeyDescriptors[-1]
-        if lastItemType == 'object':
-            self._deserializeSchema(currJsonItem, lastItemKey, schemaClass)
-        elif lastItemType == 'array':
-            if type(lastItemKey) is int:
-                self._deserializeSchema(currJsonItem, lastItemKey, schemaClass)
-            elif type(lastItemKey) is slice:
-                sliceStart = lastItemKey.start if lastItemKey.start is not None else 0
-                sliceEnd = lastItemKey.stop if lastItemKey.stop is not None else len(currJsonItem)
-                sliceStep = lastItemKey.step if lastItemKey.step is not None else 1
-                for schemaIdx in range(sliceStart, sliceEnd, sliceStep):
-                    self._deserializeSchema(currJsonItem, schemaIdx, schemaClass)
-            else:
-                raise TypeError(f"An array cannot be accessed by a key of type {type(lastItemKey)}")
-        else:
-            raise ValueError(f"Unknown path list item type: {itemType}")
-
-    def _deserializeSchema(self, jsonItem, keyToSchema, schemaClass: type[Schema]):
+                (lastItemType, lastItemKey) = currPathKeyDescriptors[-1]
+                if lastItemType == 'object':
+                    deserializeSchema(currJsonItem, lastItemKey, fromSerialized)
+                elif lastItemType == 'array':
+                    if type(lastItemKey) is int:
+                        deserializeSchema(currJsonItem, lastItemKey, fromSerialized)
+                    elif type(lastItemKey) is slice:
+                        sliceStart = lastItemKey.start if lastItemKey.start is not None else 0
+                        sliceEnd = lastItemKey.stop if lastItemKey.stop is not None else len(currJsonItem)
+                        sliceStep = lastItemKey.step if lastItemKey.step is not None else 1
+                        for schemaIdx in range(sliceStart, sliceEnd, sliceStep):
+                            deserializeSchema(currJsonItem, schemaIdx, fromSerialized)
+                    else:
+                        raise TypeError(f"An array cannot be accessed by a key of type {type(lastItemKey)}")
+                else:
+                    raise ValueError(f"Unknown path list item type: {lastItemType}")
+
+    def _deserializeSchema(self, jsonItem, keyToSchema, fromSerialized: Callable[[dict], Schema]):
         try:
-            jsonItem[keyToSchema] = schemaClass.fromSerialized(jsonItem[keyToSchema])
+            jsonItem[keyToSchema] = fromSerialized(jsonItem[keyToSchema])
         except KeyError as err:
             jsonItem[keyToSchema]['__schema_deserialization_failed'] = {'cause': err}
 
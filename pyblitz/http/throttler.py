@@ -1,6 +1,5 @@
-from threading import Timer
+from threading import Event, Lock, Timer
 from typing import Union
-from time import sleep
 
 from .requests import Request
 
@@ -9,33 +8,30 @@ class RequestThrottler:
     def __init__(self):
         self._throttle = 0
         self._pendingTimer = None
+        # set whenever requests are allowed through; waiting on it (instead of polling
+        # with sleep()) wakes senders up the moment the timeout ends
+        self._outOfTimeoutEvent = Event()
+        self._outOfTimeoutEvent.set()
+        # requests can be sent from many threads at once; this lets them out of
+        # the timeout one at a time, so each one still starts its own timeout
+        self._sendLock = Lock()
 
     def setThrottle(self, requestRateSecs: Union[float, int]):
         assert type(requestRateSecs) in (float, int)
         self._throttle = requestRateSecs
 
     def sendRequest(self, request: Request):
-        self._waitUntilOutOfTimeout()
-        self._startTimeout()
+        with self._sendLock:
+            self._waitUntilOutOfTimeout()
+            self._startTimeout()
         return request.send()
 
-    @property
-    def _inTimeout(self):
-        return self._pendingTimer is not None
-
     def _waitUntilOutOfTimeout(self):
-        sleepTime = self._throttle / 100
-        sleepsDone = 0
-        while self._inTimeout:
-            sleep(sleepTime)
-            sleepsDone += 1
-            if sleepsDone == 50:
-                sleepTime *= 10
-            elif sleepsDone == 105:
-                sleepTime *= 5
+        self._outOfTimeoutEvent.wait()
 
     def _startTimeout(self):
         if self._throttle > 0:
+            self._outOfTimeoutEvent.clear()
             self._pendingTimer = Timer(self._throttle, self._onTimerEnd)
             self._pendingTimer.start()
 
@@ -44,3 +40,4 @@ class RequestThrottler:
 
     def _clearTimer(self):
         self._pendingTimer = None
+        self._outOfTimeoutEvent.set()